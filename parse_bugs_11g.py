@@ -1,10 +1,16 @@
-import xml.etree.ElementTree as ET
-import glob
+try:
+    # lxml(libxml2)이 있으면 사용하고, 없으면 표준 라이브러리로 폴백
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+import fnmatch
 import zipfile
-import io
+import functools
 import os
 import re
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 
@@ -15,8 +21,13 @@ PSU_VERSION_PATTERN = re.compile(
     r"(11\.2\.0\.4\.[^\s(]+)",
     re.IGNORECASE,
 )
+NON_DIGIT_PATTERN = re.compile(r"[^\d]+")
 
+# 미리 파싱해 둘 ZIP 수 (모든 워커가 쉬지 않도록 CPU 수보다 하나 더)
+PREFETCH_DEPTH = (os.cpu_count() or 1) + 1
 
+
+@functools.lru_cache(maxsize=None)
 def _parse_zip_identity(path):
     """ZIP 파일명에서 패치 유형(COMBO/GI_PSU)과 날짜 키를 추출."""
     name = os.path.basename(path)
@@ -33,16 +44,15 @@ def _version_key(path):
     """
     patch_type, date_key, _ = _parse_zip_identity(path)
     if date_key is None:
-        name = os.path.splitext(os.path.basename(path))[0]
-        return (999999,), 1, name
+        return (999999,), 1
 
     if date_key == "4":
         numbers = (4,)
     else:
-        numbers = tuple(int(part) for part in re.split(r"[^\d]+", date_key) if part.isdigit())
+        numbers = tuple(int(part) for part in NON_DIGIT_PATTERN.split(date_key) if part.isdigit())
 
     type_priority = 0 if patch_type == "COMBO" else 1
-    return numbers, type_priority, date_key
+    return numbers, type_priority
 
 
 def _select_zip_files(zip_path):
@@ -50,9 +60,13 @@ def _select_zip_files(zip_path):
     COMBO/GI_PSU 11.2.0.4 ZIP 목록을 선택.
     같은 날짜에 COMBO와 GI_PSU가 모두 있으면 COMBO만 사용.
     """
-    candidates = []
-    for pattern in ("COMBO_11.2.0.4*.zip", "GI_PSU_11.2.0.4*.zip"):
-        candidates.extend(glob.glob(os.path.join(zip_path, pattern)))
+    # fnmatch는 glob과 같이 OS 규칙을 따름 (Windows에서는 대소문자 무시)
+    patterns = ("COMBO_11.2.0.4*.zip", "GI_PSU_11.2.0.4*.zip")
+    with os.scandir(zip_path) as it:
+        candidates = [
+            e.path for e in it
+            if any(fnmatch.fnmatch(e.name, pattern) for pattern in patterns) and e.is_file()
+        ]
 
     selected_by_date = {}
     for zip_file in candidates:
@@ -82,6 +96,9 @@ def _expected_psu_version(date_key):
 
 
 def _extract_psu_version(patch_text):
+    # PSU 버전 문자열(11.2.0.4.)이 없으면 정규식 실행을 생략
+    if "11.2.0.4." not in patch_text:
+        return None
     match = PSU_VERSION_PATTERN.search(patch_text)
     return match.group(1) if match else None
 
@@ -92,6 +109,53 @@ def _inventory_matches_release(patch_text, date_key):
     return version == _expected_psu_version(date_key)
 
 
+class _BugTarget:
+    """
+    XMLParser target: 트리를 만들지 않고 patch_description과 bug 요소만 수집.
+    파서(C 구현)가 요소마다 start/data/end를 직접 호출함.
+    """
+
+    def __init__(self):
+        self.patch_text = ""
+        self.bugs = []
+        self._in_desc = False
+        self._buf = []
+
+    def start(self, tag, attrib):
+        if tag == "bug":
+            self.bugs.append((attrib.get("number"), attrib.get("description") or ""))
+        elif tag == "patch_description":
+            self._in_desc = True
+            self._buf = []
+
+    def data(self, data):
+        if self._in_desc:
+            self._buf.append(data)
+
+    def end(self, tag):
+        if tag == "patch_description":
+            # 첫 번째 patch_description만 사용
+            if not self.patch_text:
+                self.patch_text = "".join(self._buf)
+            self._in_desc = False
+
+    def close(self):
+        return self.patch_text, self.bugs
+
+
+def _read_inventory(fp, chunk_size=64 * 1024):
+    """
+    inventory.xml을 청크 단위로 파서에 넣어 패치 설명과 BUG 목록을 추출.
+    요소 트리를 만들지 않으므로 파일 크기와 무관하게 메모리 사용이 일정함.
+
+    Returns: (patch_text, [(number, description), ...])
+    """
+    parser = ET.XMLParser(target=_BugTarget())
+    for chunk in iter(lambda: fp.read(chunk_size), b""):
+        parser.feed(chunk)
+    return parser.close()
+
+
 def _prefer_inventory_path(path):
     """
     동일 patch_description의 중복 inventory 중 우선할 경로를 결정.
@@ -100,6 +164,54 @@ def _prefer_inventory_path(path):
     return ("/custom/server/" in path.lower(), path.lower())
 
 
+def _parse_zip(zip_file, date_key):
+    """
+    ZIP 하나에서 현재 PSU 버전에 해당하는 inventory.xml만 파싱.
+    병렬 처리를 위해 공유 상태 없이 patch_description 순으로 정렬된 결과만 반환.
+
+    Returns: [(patch_text, [(number, description), ...]), ...]
+    """
+    inventories_by_patch = {}
+
+    with zipfile.ZipFile(zip_file, "r") as z:
+        for info in z.infolist():
+            inv_file = info.filename
+            if inv_file.rsplit("/", 1)[-1] != "inventory.xml":
+                continue
+
+            with z.open(info, "r") as fp:
+                patch_text, bugs = _read_inventory(fp)
+
+            if not patch_text or not _inventory_matches_release(patch_text, date_key):
+                continue
+
+            bugs = [(number, description) for number, description in bugs if number]
+
+            current = inventories_by_patch.get(patch_text)
+            candidate = (inv_file, bugs)
+            if current is None or _prefer_inventory_path(inv_file) < _prefer_inventory_path(current[0]):
+                inventories_by_patch[patch_text] = candidate
+
+    return [(patch_text, bugs) for patch_text, (_, bugs) in sorted(inventories_by_patch.items())]
+
+
+def _prefetch(executor, func, args_list, depth=PREFETCH_DEPTH):
+    """
+    args_list 순서대로 작업을 제출하되, 미리 제출하는 작업 수를 depth개로 제한.
+    현재 ZIP 결과를 병합하는 동안 다음 ZIP들을 미리 파싱하면서도
+    전체 ZIP의 파싱 결과가 한꺼번에 메모리에 쌓이지 않도록 함.
+
+    Yields: 제출 순서대로 Future
+    """
+    pending = deque()
+    for args in args_list:
+        pending.append(executor.submit(func, *args))
+        if len(pending) >= depth:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
 def parse_bugs_from_zip(zip_path, output_file=None):
     """
     지정된 경로의 COMBO/GI_PSU 11.2.0.4 ZIP 파일에서 inventory.xml을 파싱하여
@@ -111,61 +223,48 @@ def parse_bugs_from_zip(zip_path, output_file=None):
     """
     zip_files = _select_zip_files(zip_path)
 
-    output_lines = []
-    bug_positions = {}
+    seen_bugs = set()
     last_psu_version = None
 
-    for zip_file in zip_files:
-        patch_type, date_key, _ = _parse_zip_identity(zip_file)
-        label = _psu_label(patch_type, date_key)
-
-        inventories_by_patch = {}
-
-        with zipfile.ZipFile(zip_file, "r") as z:
-            for inv_file in z.namelist():
-                if not inv_file.endswith("inventory.xml"):
-                    continue
-
-                xml_content = z.read(inv_file)
-                root = ET.parse(io.BytesIO(xml_content)).getroot()
-
-                patch_desc = root.find("patch_description")
-                patch_text = patch_desc.text if patch_desc is not None else ""
-                if not patch_text or not _inventory_matches_release(patch_text, date_key):
-                    continue
-
-                bugs = []
-                for bug in root.findall(".//bug"):
-                    number = bug.get("number")
-                    if not number:
+    identities = [_parse_zip_identity(zip_file) for zip_file in zip_files]
+
+    # 항상 임시 파일에 바로 쓴 뒤 이름 변경
+    # (실패 시 기존 출력 파일 보존, 자동 생성 파일명은 마지막 PSU 버전을 알아야 정해짐)
+    temp_file = f"{output_file}.tmp" if output_file else f"_Fixed_Bug_{os.getpid()}.tmp"
+    out = open(temp_file, "w", encoding="utf-8", buffering=1 << 20)
+    try:
+        # ZIP 파싱은 프로세스 풀에서 병렬로 수행하고, 중복 제거는 PSU 순서대로 메인에서 처리
+        with out, ProcessPoolExecutor() as executor:
+            futures = _prefetch(
+                executor, _parse_zip,
+                [(zip_file, date_key) for zip_file, (_, date_key, _) in zip(zip_files, identities)],
+            )
+
+            for (patch_type, date_key, _), future in zip(identities, futures):
+                inventories = future.result()
+                header = f"### {_psu_label(patch_type, date_key)}\n"
+
+                for patch_text, bugs in inventories:
+                    new_bug_lines = []
+                    for number, description in bugs:
+                        if number in seen_bugs:
+                            continue
+                        line = f"     BUG {number} - {description}\n"
+                        seen_bugs.add(number)
+                        new_bug_lines.append(line)
+
+                    if not new_bug_lines:
                         continue
-                    description = bug.get("description") or ""
-                    bugs.append((number, description))
-
-                current = inventories_by_patch.get(patch_text)
-                candidate = (inv_file, bugs)
-                if current is None or _prefer_inventory_path(inv_file) < _prefer_inventory_path(current[0]):
-                    inventories_by_patch[patch_text] = candidate
-
-        for patch_text, (_, bugs) in sorted(inventories_by_patch.items()):
-            new_bug_lines = []
-            for number, description in bugs:
-                if number in bug_positions:
-                    continue
-                line = f"     BUG {number} - {description}\n"
-                bug_positions[number] = len(output_lines) + len(new_bug_lines) + 2
-                new_bug_lines.append(line)
-
-            if not new_bug_lines:
-                continue
 
-            output_lines.append(f"### {label}\n")
-            output_lines.append(f" *** {patch_text}\n")
-            output_lines.extend(new_bug_lines)
+                    # 헤더와 BUG 라인을 합쳐 RU 단위로 한 번에 기록
+                    out.write(f"{header} *** {patch_text}\n" + "".join(new_bug_lines))
 
-            version = _extract_psu_version(patch_text)
-            if version:
-                last_psu_version = version
+                    version = _extract_psu_version(patch_text)
+                    if version:
+                        last_psu_version = version
+    except BaseException:
+        os.remove(temp_file)
+        raise
 
     if output_file is None:
         today = datetime.now().strftime("%Y%m%d")
@@ -174,10 +273,7 @@ def parse_bugs_from_zip(zip_path, output_file=None):
         else:
             output_file = f"Fixed_Bug_11.2.0.4_{today}.txt"
 
-    with open(output_file, "w", encoding="utf-8") as f:
-        for line in output_lines:
-            if line is not None:
-                f.write(line)
+    os.replace(temp_file, output_file)
 
     return output_file
 
@@ -1,12 +1,23 @@
-import xml.etree.ElementTree as ET
-import glob
+try:
+    # lxml(libxml2)이 있으면 사용하고, 없으면 표준 라이브러리로 폴백
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+import fnmatch
 import zipfile
-import io
 import os
 import re
 import sys
 from datetime import datetime
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+
+
+NON_DIGIT_PATTERN = re.compile(r"[^\d]+")
+DB_RU_VERSION_PATTERN = re.compile(r'Database Release Update\s*:\s*([\d.]+)')
+
+# 미리 파싱해 둘 ZIP 수 (모든 워커가 쉬지 않도록 CPU 수보다 하나 더)
+PREFETCH_DEPTH = (os.cpu_count() or 1) + 1
 
 
 def _version_key(path):
@@ -21,10 +32,99 @@ def _version_key(path):
     version = name.split("RU_", 1)[1] if "RU_" in name else name
 
     # 버전 문자열에서 숫자만 추출하여 정수 튜플로 변환
-    numbers = [int(part) for part in re.split(r"[^\d]+", version) if part.isdigit()]
+    numbers = [int(part) for part in NON_DIGIT_PATTERN.split(version) if part.isdigit()]
     return tuple(numbers), version
 
 
+class _BugTarget:
+    """
+    XMLParser target: 트리를 만들지 않고 patch_description과 bug 요소만 수집.
+    파서(C 구현)가 요소마다 start/data/end를 직접 호출함.
+    """
+
+    def __init__(self):
+        self.patch_text = ""
+        self.bugs = []
+        self._in_desc = False
+        self._buf = []
+
+    def start(self, tag, attrib):
+        if tag == 'bug':
+            self.bugs.append((attrib.get('number'), attrib.get('description') or ""))
+        elif tag == 'patch_description':
+            self._in_desc = True
+            self._buf = []
+
+    def data(self, data):
+        if self._in_desc:
+            self._buf.append(data)
+
+    def end(self, tag):
+        if tag == 'patch_description':
+            # 첫 번째 patch_description만 사용
+            if not self.patch_text:
+                self.patch_text = "".join(self._buf)
+            self._in_desc = False
+
+    def close(self):
+        return self.patch_text, self.bugs
+
+
+def _read_inventory(fp, chunk_size=64 * 1024):
+    """
+    inventory.xml을 청크 단위로 파서에 넣어 패치 설명과 BUG 목록을 추출.
+    요소 트리를 만들지 않으므로 파일 크기와 무관하게 메모리 사용이 일정함.
+
+    Returns: (patch_text, [(number, description), ...])
+    """
+    parser = ET.XMLParser(target=_BugTarget())
+    for chunk in iter(lambda: fp.read(chunk_size), b""):
+        parser.feed(chunk)
+    return parser.close()
+
+
+def _parse_zip(zip_file):
+    """
+    ZIP 하나에서 patch_description이 있는 inventory.xml을 모두 파싱.
+    병렬 처리를 위해 공유 상태 없이 결과만 반환.
+
+    Returns: [(patch_text, [(number, description), ...]), ...]
+    """
+    inventories = []
+    with zipfile.ZipFile(zip_file, 'r') as z:
+        # ZIP 내 각 inventory.xml 파일 처리
+        # (파일명 전체가 inventory.xml인 항목만 대상, ZipInfo를 그대로 넘겨 이름 재조회 생략)
+        for info in z.infolist():
+            if info.filename.rsplit('/', 1)[-1] != 'inventory.xml':
+                continue
+
+            # XML 파일을 스트리밍으로 파싱 (압축 해제 결과를 메모리에 올리지 않음)
+            with z.open(info, 'r') as fp:
+                patch_text, bugs = _read_inventory(fp)
+
+            # patch_description이 있는 경우에만 처리
+            if patch_text:
+                inventories.append((patch_text, bugs))
+    return inventories
+
+
+def _prefetch(executor, func, args_list, depth=PREFETCH_DEPTH):
+    """
+    args_list 순서대로 작업을 제출하되, 미리 제출하는 작업 수를 depth개로 제한.
+    현재 ZIP 결과를 병합하는 동안 다음 ZIP들을 미리 파싱하면서도
+    전체 ZIP의 파싱 결과가 한꺼번에 메모리에 쌓이지 않도록 함.
+
+    Yields: 제출 순서대로 Future
+    """
+    pending = deque()
+    for args in args_list:
+        pending.append(executor.submit(func, *args))
+        if len(pending) >= depth:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
 def parse_bugs_from_zip(zip_path, output_file=None):
     """
     지정된 경로의 모든 ZIP 파일에서 inventory.xml을 파싱하여
@@ -35,56 +135,60 @@ def parse_bugs_from_zip(zip_path, output_file=None):
         output_file (str): 출력 파일명 (None이면 자동 생성)
     """
     # 디렉터리 내 모든 ZIP 파일을 버전 순서대로 정렬
-    zip_files = sorted([f for f in glob.glob(f"{zip_path}/*.zip") if "19." in os.path.basename(f)], key=_version_key)
-
-    output_lines = []           # 출력할 라인들을 저장
-    bug_positions = {}          # 이미 출력된 BUG 번호 추적 (중복 방지용)
+    # (정렬 키는 ZIP마다 한 번만 계산하고, 키의 version을 표시용 이름으로 재사용)
+    # fnmatch는 glob과 같이 OS 규칙을 따름 (Windows에서는 *.ZIP도 대소문자 무시하고 매칭)
+    with os.scandir(zip_path) as it:
+        zip_entries = sorted(
+            ((_version_key(e.path), e.path) for e in it
+             if fnmatch.fnmatch(e.name, "*.zip") and "19." in e.name and e.is_file()),
+            key=lambda entry: entry[0][0],  # 숫자 튜플만 비교 (문자열 비교 생략)
+        )
+
+    seen_bugs = set()           # 이미 출력된 BUG 번호 추적 (중복 방지용)
     last_db_version = None      # 마지막 DB RU 버전 추적
 
-    # 각 ZIP 파일 순회
-    for zip_file in zip_files:
-        with zipfile.ZipFile(zip_file, 'r') as z:
-            # ZIP 내에서 inventory.xml 파일 목록 검색
-            inventory_files = [name for name in z.namelist() if name.endswith('inventory.xml')]
-
-            # 각 inventory.xml 파일 처리
-            for inv_file in inventory_files:
-                # XML 파일 읽기 및 파싱
-                xml_content = z.read(inv_file)
-                root = ET.parse(io.BytesIO(xml_content)).getroot()
+    # 결과는 모아 두지 않고 파일에 바로 기록
+    # (항상 임시 파일에 쓴 뒤 이름 변경 — 실패 시 기존 출력 파일을 건드리지 않고,
+    #  자동 생성 파일명은 마지막 DB RU 버전을 알아야 정해지므로)
+    temp_file = f"{output_file}.tmp" if output_file else f"_Fixed_Bug_{os.getpid()}.tmp"
+    out = open(temp_file, 'w', encoding='utf-8', buffering=1 << 20)
+    try:
+        # ZIP 파싱(압축 해제 + XML)은 프로세스 풀에서 병렬로 수행하고,
+        # 중복 제거와 출력 순서는 메인 프로세스에서 버전 순서대로 처리
+        with out, ProcessPoolExecutor() as executor:
+            futures = _prefetch(executor, _parse_zip, [(zip_file,) for _, zip_file in zip_entries])
 
-                # patch_description 요소에서 패치 설명 텍스트 추출
-                patch_desc = root.find('patch_description')
-                patch_text = patch_desc.text if patch_desc is not None else ""
+            for ((_, display_name), _), future in zip(zip_entries, futures):
+                inventories = future.result()
 
-                # patch_description이 있는 경우에만 처리
-                if patch_text:
-                    # ZIP 파일명에서 표시용 버전 이름 생성
-                    zip_name = os.path.splitext(os.path.basename(zip_file))[0]
-                    display_name = zip_name.split("RU_", 1)[1] if "RU_" in zip_name else zip_name
+                # 버전 헤더는 ZIP마다 한 번만 생성 (ZIP 내 inventory 수와 무관)
+                header = f"### RU {display_name}\n"
 
-                    # 버전 헤더와 패치 설명 추가
-                    output_lines.append(f"### RU {display_name}\n")
-                    output_lines.append(f" *** {patch_text}\n")
+                for patch_text, bugs in inventories:
+                    # 버전 헤더와 패치 설명 추가 (RU 단위로 모아 한 번에 기록)
+                    lines = [header, f" *** {patch_text}\n"]
 
                     # "Database Release Update :" 뒤의 버전 정보 추출
-                    match = re.search(r'Database Release Update\s*:\s*([\d.]+)', patch_text)
-                    if match:
-                        last_db_version = match.group(1)
+                    # (OCW 등 다른 서브 패치는 문자열 검사만으로 정규식 실행을 생략)
+                    if "Database Release Update" in patch_text:
+                        match = DB_RU_VERSION_PATTERN.search(patch_text)
+                        if match:
+                            last_db_version = match.group(1)
 
                     # XML 내 모든 bug 요소 순회
-                    for bug in root.findall('.//bug'):
-                        number = bug.get('number')
-                        description = bug.get('description') or ""
-                        line = f"     BUG {number} - {description}\n"
-
+                    for number, description in bugs:
                         # 이미 출력된 BUG 번호는 건너뜀 (중복 제거)
-                        if number in bug_positions:
+                        if number in seen_bugs:
                             continue
 
                         # 새로운 BUG 번호 기록 및 출력 라인 추가
-                        bug_positions[number] = len(output_lines)
-                        output_lines.append(line)
+                        seen_bugs.add(number)
+                        lines.append(f"     BUG {number} - {description}\n")
+
+                    out.write("".join(lines))
+    except BaseException:
+        os.remove(temp_file)
+        raise
 
     # 출력 파일명: Fixed_Bug_For_<버전>_<날짜>.txt
     # (26ai는 Fixed_Bug_For_<버전>_DB|GI_<날짜>.txt — 제품 구분자가 버전 뒤에 옴)
@@ -95,11 +199,8 @@ def parse_bugs_from_zip(zip_path, output_file=None):
         else:
             output_file = f"Fixed_Bug_For_{today}.txt"
 
-    # 결과를 파일에 저장
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for line in output_lines:
-            if line is not None:
-                f.write(line)
+    # 임시 파일을 최종 파일명으로 변경
+    os.replace(temp_file, output_file)
 
     return output_file
 
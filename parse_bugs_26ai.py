@@ -1,18 +1,30 @@
-import xml.etree.ElementTree as ET
-import glob
+try:
+    # lxml(libxml2)이 있으면 사용하고, 없으면 표준 라이브러리로 폴백
+    from lxml import etree as ET
+except ImportError:
+    import xml.etree.ElementTree as ET
+import fnmatch
 import subprocess
 import tempfile
 import zipfile
-import io
 import os
 import re
 import sys
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 
 # 7-Zip 경로 (Windows 기본 설치 경로)
 SEVENZIP_PATH = r"C:\Program Files\7-Zip\7z.exe"
 
+GOLDIMG_NAME_PATTERN = re.compile(r'GOLDIMG_(?:DB|GI)_(.+)')
+NON_DIGIT_PATTERN = re.compile(r"[^\d]+")
+RU_VERSION_PATTERN = re.compile(r'(?:Database|Grid Infrastructure) Release Update\s*:\s*([\d.]+)')
+
+# 미리 파싱해 둘 ZIP 수 (모든 워커가 쉬지 않도록 CPU 수보다 하나 더)
+PREFETCH_DEPTH = (os.cpu_count() or 1) + 1
+
 
 def _version_key(path):
     """
@@ -22,14 +34,61 @@ def _version_key(path):
     name = os.path.splitext(os.path.basename(path))[0]
 
     # "GOLDIMG_DB_" 또는 "GOLDIMG_GI_" 이후의 버전 문자열 추출
-    match = re.search(r'GOLDIMG_(?:DB|GI)_(.+)', name)
+    match = GOLDIMG_NAME_PATTERN.search(name)
     version = match.group(1) if match else name
 
     # 버전 문자열에서 숫자만 추출하여 정수 튜플로 변환
-    numbers = [int(part) for part in re.split(r"[^\d]+", version) if part.isdigit()]
+    numbers = [int(part) for part in NON_DIGIT_PATTERN.split(version) if part.isdigit()]
     return tuple(numbers), version
 
 
+class _BugTarget:
+    """
+    XMLParser target: 트리를 만들지 않고 patch_description과 bug 요소만 수집.
+    파서(C 구현)가 요소마다 start/data/end를 직접 호출함.
+    """
+
+    def __init__(self):
+        self.patch_text = ""
+        self.bugs = []
+        self._in_desc = False
+        self._buf = []
+
+    def start(self, tag, attrib):
+        if tag == 'bug':
+            self.bugs.append((attrib.get('number'), attrib.get('description') or ""))
+        elif tag == 'patch_description':
+            self._in_desc = True
+            self._buf = []
+
+    def data(self, data):
+        if self._in_desc:
+            self._buf.append(data)
+
+    def end(self, tag):
+        if tag == 'patch_description':
+            # 첫 번째 patch_description만 사용
+            if not self.patch_text:
+                self.patch_text = "".join(self._buf)
+            self._in_desc = False
+
+    def close(self):
+        return self.patch_text, self.bugs
+
+
+def _read_inventory(fp, chunk_size=64 * 1024):
+    """
+    inventory.xml을 청크 단위로 파서에 넣어 패치 설명과 BUG 목록을 추출.
+    요소 트리를 만들지 않으므로 파일 크기와 무관하게 메모리 사용이 일정함.
+
+    Returns: (patch_text, [(number, description), ...])
+    """
+    parser = ET.XMLParser(target=_BugTarget())
+    for chunk in iter(lambda: fp.read(chunk_size), b""):
+        parser.feed(chunk)
+    return parser.close()
+
+
 def _list_inventory_files_7z(zip_path):
     """
     7z를 사용하여 ZIP 내 inventory.xml 파일 목록과 크기를 빠르게 조회.
@@ -55,7 +114,8 @@ def _list_inventory_files_7z(zip_path):
                 current_size = 0
 
         # 한 엔트리의 정보가 모이면 inventory.xml 여부 확인
-        if current_path and current_path.endswith('inventory.xml'):
+        # (7z는 OS 경로 구분자를 쓰므로 / 와 \ 모두 고려)
+        if current_path and current_path.replace('\\', '/').rsplit('/', 1)[-1] == 'inventory.xml':
             if '.patch_storage' not in current_path:
                 candidates.append((current_path, current_size))
             current_path = None
@@ -77,6 +137,23 @@ def _extract_file_7z(zip_path, internal_path, output_dir):
     return os.path.join(output_dir, filename)
 
 
+def _prefetch(executor, func, args_list, depth=PREFETCH_DEPTH):
+    """
+    args_list 순서대로 작업을 제출하되, 미리 제출하는 작업 수를 depth개로 제한.
+    현재 ZIP 결과를 병합하는 동안 다음 ZIP들을 미리 파싱하면서도
+    전체 ZIP의 파싱 결과가 한꺼번에 메모리에 쌓이지 않도록 함.
+
+    Yields: 제출 순서대로 Future
+    """
+    pending = deque()
+    for args in args_list:
+        pending.append(executor.submit(func, *args))
+        if len(pending) >= depth:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
 def parse_bugs_from_goldimg(zip_path, patch_type, output_file=None):
     """
     지정된 경로의 GOLDIMG ZIP 파일에서 inventory.xml을 파싱하여
@@ -88,9 +165,16 @@ def parse_bugs_from_goldimg(zip_path, patch_type, output_file=None):
         output_file (str): 출력 파일명 (None이면 자동 생성)
     """
     pattern = f"GOLDIMG_{patch_type}_*.zip"
-    zip_files = sorted(glob.glob(os.path.join(zip_path, pattern)), key=_version_key)
-
-    if not zip_files:
+    # 정렬 키는 ZIP마다 한 번만 계산하고, 키의 version을 표시용 이름으로 재사용
+    # fnmatch는 glob과 같이 OS 규칙을 따름 (Windows에서는 대소문자 무시)
+    with os.scandir(zip_path) as it:
+        zip_entries = sorted(
+            ((_version_key(e.path), e.path) for e in it
+             if fnmatch.fnmatch(e.name, pattern) and e.is_file()),
+            key=lambda entry: entry[0][0],  # 숫자 튜플만 비교 (문자열 비교 생략)
+        )
+
+    if not zip_entries:
         print(f"  {pattern} 파일이 없습니다.")
         return None
 
@@ -101,71 +185,76 @@ def parse_bugs_from_goldimg(zip_path, patch_type, output_file=None):
     else:
         print(f"  7-Zip 미설치. Python zipfile 사용 (대용량 파일은 느릴 수 있음)")
 
-    output_lines = []           # 출력할 라인들을 저장
-    bug_positions = {}          # 이미 출력된 BUG 번호 추적 (중복 방지용)
+    has_output = False          # 출력한 패치 정보가 있는지 여부
+    seen_bugs = set()           # 이미 출력된 BUG 번호 추적 (중복 방지용)
     last_version = None         # 마지막 버전 추적
     type_label = "Database" if patch_type == "DB" else "Grid Infrastructure"
+    parse_func = _parse_with_7z if use_7z else _parse_with_zipfile
 
-    # 각 ZIP 파일 순회
-    for zip_file in zip_files:
-        zip_basename = os.path.basename(zip_file)
-        print(f"  처리 중: {zip_basename}")
-
-        try:
-            if use_7z:
-                root = _parse_with_7z(zip_file)
-            else:
-                root = _parse_with_zipfile(zip_file)
-
-            if root is None:
-                print(f"    ⚠ inventory.xml을 찾을 수 없습니다.")
-                continue
-
-            # patch_description 요소에서 패치 설명 텍스트 추출
-            patch_desc = root.find('patch_description')
-            patch_text = patch_desc.text if patch_desc is not None else ""
-
-            if not patch_text:
-                continue
-
-            # ZIP 파일명에서 표시용 버전 이름 생성
-            _, display_name = _version_key(zip_file)
-
-            # 버전 헤더와 패치 설명 추가
-            output_lines.append(f"### {type_label} RU {display_name}\n")
-            output_lines.append(f" *** {patch_text}\n")
-
-            # "Database/Grid Infrastructure Release Update :" 뒤의 버전 정보 추출
-            ver_match = re.search(
-                r'(?:Database|Grid Infrastructure) Release Update\s*:\s*([\d.]+)',
-                patch_text
-            )
-            if ver_match:
-                last_version = ver_match.group(1)
-
-            # XML 내 모든 bug 요소 순회
-            bug_count = 0
-            for bug in root.findall('.//bug'):
-                number = bug.get('number')
-                description = bug.get('description') or ""
-                line = f"     BUG {number} - {description}\n"
-
-                # 이미 출력된 BUG 번호는 건너뜀 (중복 제거)
-                if number in bug_positions:
-                    continue
+    # 결과는 모아 두지 않고 파일에 바로 기록
+    # (항상 임시 파일에 쓴 뒤 이름 변경 — 실패하거나 결과가 없으면 기존 출력 파일을 건드리지 않고,
+    #  자동 생성 파일명은 마지막 버전을 알아야 정해지므로)
+    temp_file = f"{output_file}.tmp" if output_file else f"_Fixed_Bug_{patch_type}_{os.getpid()}.tmp"
+    out = open(temp_file, 'w', encoding='utf-8', buffering=1 << 20)
+    try:
+        # ZIP 파싱은 프로세스 풀에서 병렬로 수행하고, 결과는 버전 순서대로 메인에서 병합
+        with out, ProcessPoolExecutor() as executor:
+            futures = _prefetch(executor, parse_func, [(zip_file,) for _, zip_file in zip_entries])
+
+            # 각 ZIP 파일 순회
+            for ((_, display_name), zip_file), future in zip(zip_entries, futures):
+                zip_basename = os.path.basename(zip_file)
+                print(f"  처리 중: {zip_basename}")
+
+                try:
+                    inventory = future.result()
+
+                    if inventory is None:
+                        print(f"    ⚠ inventory.xml을 찾을 수 없습니다.")
+                        continue
+
+                    inv_path, inv_size, patch_text, bugs = inventory
+                    print(f"    → {inv_path} ({inv_size:,} bytes)")
+
+                    if not patch_text:
+                        continue
+
+                    # 버전 헤더와 패치 설명 추가 (RU 단위로 모아 한 번에 기록)
+                    lines = [f"### {type_label} RU {display_name}\n", f" *** {patch_text}\n"]
 
-                # 새로운 BUG 번호 기록 및 출력 라인 추가
-                bug_positions[number] = len(output_lines)
-                output_lines.append(line)
-                bug_count += 1
+                    # "Database/Grid Infrastructure Release Update :" 뒤의 버전 정보 추출
+                    # (문자열 검사로 먼저 걸러 해당 문구가 없으면 정규식 실행을 생략)
+                    if "Release Update" in patch_text:
+                        ver_match = RU_VERSION_PATTERN.search(patch_text)
+                        if ver_match:
+                            last_version = ver_match.group(1)
 
-            print(f"    → 새로운 BUG {bug_count}개 추가 (누적 {len(bug_positions)}개)")
+                    # XML 내 모든 bug 요소 순회
+                    bug_count = 0
+                    for number, description in bugs:
+                        # 이미 출력된 BUG 번호는 건너뜀 (중복 제거)
+                        if number in seen_bugs:
+                            continue
 
-        except Exception as e:
-            print(f"    ⚠ 오류 발생: {e}")
-            continue
+                        # 새로운 BUG 번호 기록 및 출력 라인 추가
+                        seen_bugs.add(number)
+                        lines.append(f"     BUG {number} - {description}\n")
+                        bug_count += 1
 
-    if not output_lines:
+                    out.write("".join(lines))
+                    has_output = True
+
+                    print(f"    → 새로운 BUG {bug_count}개 추가 (누적 {len(seen_bugs)}개)")
+
+                except Exception as e:
+                    print(f"    ⚠ 오류 발생: {e}")
+                    continue
+    except BaseException:
+        os.remove(temp_file)
+        raise
+
+    if not has_output:
+        os.remove(temp_file)
         print(f"  추출된 패치 정보가 없습니다.")
         return None
 
@@ -178,11 +267,8 @@ def parse_bugs_from_goldimg(zip_path, patch_type, output_file=None):
         else:
             output_file = f"Fixed_Bug_For_{patch_type}_{today}.txt"
 
-    # 결과를 파일에 저장
-    with open(output_file, 'w', encoding='utf-8') as f:
-        for line in output_lines:
-            if line is not None:
-                f.write(line)
+    # 임시 파일을 최종 파일명으로 변경
+    os.replace(temp_file, output_file)
 
     return output_file
 
@@ -191,6 +277,8 @@ def _parse_with_7z(zip_file):
     """
     7z를 사용하여 ZIP에서 메인 inventory.xml을 추출 후 파싱.
     가장 큰 inventory.xml = 메인 RU 패치.
+
+    Returns: (inventory 경로, 크기, patch_text, bugs) 또는 None
     """
     candidates = _list_inventory_files_7z(zip_file)
 
@@ -199,47 +287,38 @@ def _parse_with_7z(zip_file):
 
     # 가장 큰 inventory.xml 선택
     main_inv_path, main_inv_size = max(candidates, key=lambda x: x[1])
-    print(f"    → {main_inv_path} ({main_inv_size:,} bytes)")
 
-    # 임시 디렉터리에 추출
-    temp_dir = os.path.join(os.path.dirname(zip_file) or ".", "_temp_extract")
-    os.makedirs(temp_dir, exist_ok=True)
-
-    try:
+    # ZIP마다 별도 임시 디렉터리에 추출 (병렬 실행 시 충돌 방지, 종료 시 자동 정리)
+    with tempfile.TemporaryDirectory(prefix="_temp_extract_", dir=os.path.dirname(zip_file) or ".") as temp_dir:
         extracted = _extract_file_7z(zip_file, main_inv_path, temp_dir)
-        root = ET.parse(extracted).getroot()
-        return root
-    finally:
-        # 임시 파일 정리
-        inv_file = os.path.join(temp_dir, "inventory.xml")
-        if os.path.exists(inv_file):
-            os.remove(inv_file)
-        try:
-            os.rmdir(temp_dir)
-        except OSError:
-            pass
+        with open(extracted, 'rb') as fp:
+            patch_text, bugs = _read_inventory(fp)
+
+    return main_inv_path, main_inv_size, patch_text, bugs
 
 
 def _parse_with_zipfile(zip_file):
     """
     Python zipfile을 사용하여 ZIP에서 메인 inventory.xml을 파싱.
     대용량 파일에서는 느릴 수 있음.
+
+    Returns: (inventory 경로, 크기, patch_text, bugs) 또는 None
     """
     with zipfile.ZipFile(zip_file, 'r') as z:
         candidates = []
         for info in z.infolist():
-            if info.filename.endswith('inventory.xml') and '.patch_storage' not in info.filename:
+            if info.filename.rsplit('/', 1)[-1] == 'inventory.xml' and '.patch_storage' not in info.filename:
                 candidates.append(info)
 
         if not candidates:
             return None
 
         main_inv = max(candidates, key=lambda x: x.file_size)
-        print(f"    → {main_inv.filename} ({main_inv.file_size:,} bytes)")
 
-        xml_content = z.read(main_inv.filename)
-        root = ET.parse(io.BytesIO(xml_content)).getroot()
-        return root
+        with z.open(main_inv, 'r') as fp:
+            patch_text, bugs = _read_inventory(fp)
+
+    return main_inv.filename, main_inv.file_size, patch_text, bugs
 
 
 if __name__ == "__main__":